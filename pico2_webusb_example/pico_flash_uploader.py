@@ -9,7 +9,9 @@ streams the selected file over a vendor‑class bulk OUT endpoint.  The
 device acknowledges major steps by sending short ASCII status strings on
 its bulk IN endpoint (for example "OK" at the end of a successful
 transfer).  The script prints these messages so you can watch the
-progress.
+progress.  The header (magic "FWUC") carries a CRC‑32 of the file; once
+the device has written everything it reads the flash back and answers
+"CRC_OK" or "CRC_FAIL", so no separate verify pass over USB is needed.
 
 Usage:
 
@@ -25,13 +27,26 @@ requires the PyUSB package (install via ``pip install pyusb``).  When
 communicating on Linux, you may need to create a udev rule or run the
 script with elevated privileges so that libusb can claim the device.
 
+If the optional python-libusb1 package is installed (``pip install
+libusb1``), the payload is streamed through a queue of asynchronous bulk
+transfers so the USB host controller never sits idle between chunks.
+Without it the script falls back to synchronous PyUSB writes.
+
 """
 
 import argparse
+import array
+import contextlib
+import ctypes
+import mmap
+import os
+import queue
 import struct
 import sys
+import threading
 import time
-from typing import Optional
+import zlib
+from typing import Callable, Iterable, Optional, Union
 
 try:
     import usb.core
@@ -42,6 +57,27 @@ except ImportError as exc:
     )
     raise
 
+try:
+    import usb1
+except ImportError:
+    # python-libusb1 is optional.  Without it the payload is sent with
+    # synchronous PyUSB writes.
+    usb1 = None
+
+# Exceptions main() reports as USB errors.  python-libusb1 raises its own
+# hierarchy, unrelated to PyUSB's.
+USB_ERRORS: tuple[type[Exception], ...] = (usb.core.USBError,)
+if usb1 is not None:
+    USB_ERRORS += (usb1.USBError,)
+
+# FWUP header: magic, little‑endian payload length and CRC‑32.  Compiled
+# once rather than parsing the format string on every pack.  The magic
+# is "FWUC" rather than the "FWUP" of the older 8‑byte header without a
+# CRC, so firmware expecting the other layout rejects the header (and
+# the HEADER_OK wait times out) instead of flashing a shifted image.
+FWUP_MAGIC = b"FWUC"
+FWUP_HEADER = struct.Struct("<4sII")
+
 
 def find_device(vid: int, pid: int) -> usb.core.Device:
     """Locate and return the Pico device with the given vendor and product ID.
@@ -56,19 +92,25 @@ def find_device(vid: int, pid: int) -> usb.core.Device:
     return dev
 
 
-def detach_kernel_drivers(dev: usb.core.Device) -> None:
-    """Detach any active kernel drivers for all interfaces on the device.
+def detach_kernel_drivers(
+    dev: usb.core.Device, interfaces: Iterable[int] = (0,)
+) -> None:
+    """Detach any active kernel drivers from the given interfaces.
 
     On Linux, the kernel may automatically bind HID or CDC drivers to new
     USB devices.  To allow libusb/pyusb to claim the interface, we must
     detach these drivers.  On other platforms, this function simply
     returns.
+
+    The firmware exposes a single configuration with one vendor
+    interface, so only interface 0 is checked by default.  Walking every
+    configuration instead would make PyUSB fetch and parse all of the
+    descriptors.
     """
     try:
-        for configuration in dev:
-            for intf in configuration:
-                if dev.is_kernel_driver_active(intf.bInterfaceNumber):
-                    dev.detach_kernel_driver(intf.bInterfaceNumber)
+        for interface in interfaces:
+            if dev.is_kernel_driver_active(interface):
+                dev.detach_kernel_driver(interface)
     except NotImplementedError:
         # Some backends (e.g. Windows) do not implement this check.
         pass
@@ -87,12 +129,14 @@ def get_endpoints(
     cfg = dev.get_active_configuration()
     # Interfaces are indexed by (interface number, alternate setting).
     intf = cfg[(interface_index, 0)]
-    out_ep = usb.util.find_descriptor(
-        intf, custom_match=lambda e: e.bEndpointAddress == out_ep_addr
-    )
-    in_ep = usb.util.find_descriptor(
-        intf, custom_match=lambda e: e.bEndpointAddress == in_ep_addr
-    )
+    # One pass over the interface's endpoints, compared directly by
+    # address rather than through find_descriptor and a match lambda.
+    out_ep = in_ep = None
+    for ep in intf:
+        if ep.bEndpointAddress == out_ep_addr:
+            out_ep = ep
+        elif ep.bEndpointAddress == in_ep_addr:
+            in_ep = ep
     if out_ep is None or in_ep is None:
         raise ValueError(
             f"Could not find both endpoints on interface {interface_index}.\n"
@@ -101,169 +145,529 @@ def get_endpoints(
     return out_ep, in_ep
 
 def read_status(
-    in_ep: usb.core.Endpoint, timeout: int, suppress_exceptions: bool = True
-) -> Optional[str]:
+    in_ep: usb.core.Endpoint,
+    timeout: int,
+    suppress_exceptions: bool = True,
+    max_pkt: Optional[int] = None,
+) -> Optional["array.array[int]"]:
     """Attempt to read a status message from the device.
 
     If no data is available within the specified timeout, returns None.  If
-    data is received, decodes it as UTF‑8 (ignoring decode errors) and
-    returns the resulting string.  If ``suppress_exceptions`` is False,
-    propagates USB errors instead of returning None.
+    data is received, returns it as the byte array PyUSB produced, without
+    copying or decoding it; use :func:`decode_status` before printing it.
+    ``max_pkt`` is the endpoint's wMaxPacketSize, which callers that poll
+    repeatedly look up once and pass in.  If ``suppress_exceptions`` is
+    False, propagates USB errors instead of returning None.
     """
+    if max_pkt is None:
+        max_pkt = in_ep.wMaxPacketSize
     try:
         # wMaxPacketSize gives the maximum size we can read in one go
-        data = in_ep.read(in_ep.wMaxPacketSize, timeout=timeout)
+        data = in_ep.read(max_pkt, timeout=timeout)
         if not data:
             return None
-        # Convert to bytes then decode
-        msg = bytes(data).decode("utf-8", errors="ignore").strip()
-        return msg or None
+        return data
+    except usb.core.USBTimeoutError:
+        # Timeout errors are common if the device hasn't sent anything.
+        # Every PyUSB backend raises this subclass for them, whatever
+        # errno value the platform uses for ETIMEDOUT.
+        if suppress_exceptions:
+            return None
+        raise
     except usb.core.USBError as exc:
-            # Timeout errors are common if the device hasn't sent anything.
         if suppress_exceptions and exc.errno is None:
             return None
-        if suppress_exceptions and exc.errno in [110, 60]:  # Operation timed out
-            return None
         # Unexpected error: re‑raise
         raise
 
-def end_index(buffer: str, target: str) -> int:
-    if target not in buffer:
-        return None
-    target_rindex = buffer.rindex(target)
+def decode_status(
+    status: Union[bytes, bytearray, memoryview, "array.array[int]"]
+) -> str:
+    """Decode raw status bytes as UTF‑8 (ignoring decode errors) for display."""
+    return bytes(status).decode("utf-8", errors="ignore").strip()
 
-    return (target_rindex, target_rindex + len(target))
+def consume_status(status_buffer: bytearray, target: bytes, keep: int) -> bool:
+    """Drop everything up to and including ``target`` from ``status_buffer``.
 
-def wait_for_status(status_buffer: str, target_string: str, in_ep: usb.core.Endpoint, timeout: int, delay: float = 0.1) -> str:
+    Returns True if ``target`` was found.  Otherwise the buffer is trimmed
+    in place to its last ``keep`` bytes, which is enough to catch a target
+    split across two reads, and False is returned.  Only that bounded
+    tail is ever scanned, so matching stays linear in the bytes received.
+    """
+    match = status_buffer.find(target)
+    if match < 0:
+        del status_buffer[:-keep]
+        return False
+    del status_buffer[: match + len(target)]
+    return True
+
+def wait_for_status(status_buffer: bytearray, target_string: str, in_ep: usb.core.Endpoint, timeout: Optional[int], min_poll: int = 50, max_poll: int = 500, max_pkt: Optional[int] = None) -> bytearray:
+    """Read status messages until ``target_string`` arrives.
+
+    ``status_buffer`` holds bytes left over from earlier calls and is
+    updated in place, so that afterwards it only contains what the device
+    sent after the target.  It is also returned for convenience.
+
+    The blocking read itself is the wait: each read times out after
+    ``min_poll`` ms, doubling up to ``max_poll`` ms while the device stays
+    quiet and dropping back as soon as it sends something.  Raises
+    ``usb.core.USBTimeoutError`` if the target has not arrived within
+    ``timeout`` ms; pass None to wait indefinitely.
+    """
     print(f'-------------------------- Checking for {target_string} -------------------------- ')
-    
-    while target_string not in status_buffer:
-        status = read_status(in_ep, timeout)
+
+    if max_pkt is None:
+        max_pkt = in_ep.wMaxPacketSize
+    target = target_string.encode()
+    keep = len(target) + max_pkt
+    deadline = None if timeout is None else time.monotonic() + timeout / 1000.0
+    poll = min_poll
+    while not consume_status(status_buffer, target, keep):
+        read_timeout = poll
+        if deadline is not None:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                raise usb.core.USBTimeoutError(
+                    f"Timed out waiting for {target_string} from the device"
+                )
+            read_timeout = min(poll, remaining_ms)
+        status = read_status(in_ep, read_timeout, max_pkt=max_pkt)
         if status:
             status_buffer += status
-            continue
+            poll = min_poll
         else:
-            time.sleep(delay)
-    print(f"SB:{status_buffer}\n")
-    target_slice_start, target_slice_end = end_index(status_buffer, target_string)
-    status_buffer = status_buffer[target_slice_end:]
-    print(f"SB:{status_buffer}\n")
+            poll = min(poll * 2, max_poll)
+    print(f"SB:{decode_status(status_buffer)}\n")
 
     print(f'-------------------------- {target_string} → NEXT? -------------------------- ')
+    return status_buffer
+
+def open_libusb1_handle(
+    context: "usb1.USBContext", dev: usb.core.Device
+) -> "usb1.USBDeviceHandle":
+    """Open ``dev`` a second time through python-libusb1.
+
+    The device is matched by bus number and address so the handle refers
+    to the same physical Pico that PyUSB found.  The interface is not
+    claimed here: PyUSB keeps it for the header and erase handshake and
+    must release it (see ``usb.util.dispose_resources``) before the
+    payload phase claims it on this handle.
+    """
+    for device in context.getDeviceIterator(skip_on_error=True):
+        if (
+            device.getBusNumber() == dev.bus
+            and device.getDeviceAddress() == dev.address
+        ):
+            return device.open()
+    raise ValueError(
+        f"Device on bus {dev.bus} address {dev.address} is not visible to python-libusb1"
+    )
+
+def alloc_dma_buffer(
+    handle: "usb1.USBDeviceHandle", size: int
+) -> Optional[tuple[ctypes.Array, Callable[[], None]]]:
+    """Allocate ``size`` bytes of DMA-capable memory for ``handle``.
+
+    Wraps ``libusb_dev_mem_alloc``, which on Linux mmaps memory from the
+    usbfs device node.  Transfers whose buffers live there are handed to
+    the host controller without the kernel copying them into its own URB
+    buffers first.  python-libusb1 does not wrap this call, so it is made
+    through ctypes on the library python-libusb1 already loaded.
+
+    Returns the buffer and a function that frees it, or None if libusb,
+    the kernel or the platform cannot provide such memory.
+    """
+    lib = getattr(usb1.libusb1, "libusb", None)
+    dev_mem_alloc = getattr(lib, "libusb_dev_mem_alloc", None)
+    dev_mem_free = getattr(lib, "libusb_dev_mem_free", None)
+    # python-libusb1 keeps the raw libusb_device_handle pointer private.
+    raw_handle = getattr(handle, "_USBDeviceHandle__handle", None)
+    if dev_mem_alloc is None or dev_mem_free is None or raw_handle is None:
+        return None
+    dev_mem_alloc.argtypes = [usb1.libusb1.libusb_device_handle_p, ctypes.c_size_t]
+    dev_mem_alloc.restype = ctypes.c_void_p
+    dev_mem_free.argtypes = [
+        usb1.libusb1.libusb_device_handle_p,
+        ctypes.c_void_p,
+        ctypes.c_size_t,
+    ]
+    dev_mem_free.restype = ctypes.c_int
+    address = dev_mem_alloc(raw_handle, size)
+    if not address:
+        # Old kernels and non-Linux backends return NULL.
+        return None
+    buffer = (ctypes.c_ubyte * size).from_address(address)
+    return buffer, lambda: dev_mem_free(raw_handle, address, size)
+
+def load_payload(
+    filename: str, handle: Optional["usb1.USBDeviceHandle"] = None
+) -> tuple[Union[bytes, mmap.mmap, ctypes.Array], Callable[[], None]]:
+    """Load ``filename`` for the bulk OUT transfers.
+
+    With a python-libusb1 ``handle``, the file is read straight into a
+    buffer from :func:`alloc_dma_buffer` so neither Python nor the kernel
+    has to copy it again.  Otherwise, or if that allocation fails, the
+    file is memory-mapped rather than read, so the image is not held in
+    a second private copy and slices of it are backed by the page cache.
+    Returns the buffer and a function that releases it once the upload
+    is finished.
+    """
+    with open(filename, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            # mmap refuses empty files.
+            return b"", lambda: None
+        dma = alloc_dma_buffer(handle, size) if handle is not None else None
+        if dma is None:
+            # ACCESS_COPY keeps the mapping writable (copy-on-write, never
+            # written back), which lets python-libusb1 wrap slices of it
+            # without copying them.  The mapping outlives ``f``.
+            payload = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+            def release() -> None:
+                try:
+                    payload.close()
+                except BufferError:
+                    # A view is still held by an aborted transfer; the
+                    # mapping is dropped when that is garbage collected.
+                    pass
+
+            return payload, release
+        buffer, free = dma
+        if f.readinto(buffer) != size:
+            free()
+            raise ValueError(f"{filename} changed size while it was being read")
+        return buffer, free
+
+class StatusPoller(threading.Thread):
+    """Background thread that keeps reading status messages from ``in_ep``.
+
+    Messages are put on :attr:`messages` for the main thread to pick up,
+    so a blocking bulk OUT loop never pauses for an IN read.
+    """
+
+    def __init__(
+        self, in_ep: usb.core.Endpoint, max_pkt: int, timeout: int = 100
+    ) -> None:
+        super().__init__(name="status-poller", daemon=True)
+        self.in_ep = in_ep
+        self.max_pkt = max_pkt
+        self.timeout = timeout
+        self.messages: "queue.Queue[array.array[int]]" = queue.Queue()
+        self._stopping = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                status = read_status(self.in_ep, self.timeout, max_pkt=self.max_pkt)
+            except usb.core.USBTimeoutError:
+                # A quiet poll is not an error; the device only reports
+                # progress every so often.
+                continue
+            except usb.core.USBError:
+                # Status messages are informational; stop polling rather
+                # than spinning on a persistent error.
+                return
+            if status:
+                self.messages.put(status)
+
+    def stop(self) -> None:
+        """Ask the thread to exit and wait for its current read to finish."""
+        self._stopping.set()
+        self.join()
+
+    def drain(self, status_buffer: bytearray) -> None:
+        """Print queued messages and append them to ``status_buffer``."""
+        while True:
+            try:
+                status = self.messages.get_nowait()
+            except queue.Empty:
+                return
+            status_buffer += status
+            print(f"{decode_status(status)}")
+
+def send_payload_sync(
+    payload: memoryview,
+    out_ep: usb.core.Endpoint,
+    in_ep: usb.core.Endpoint,
+    max_pkt: int,
+    status_buffer: bytearray,
+    chunk_size: int,
+    timeout: int,
+) -> int:
+    """Send ``payload`` with one blocking PyUSB write per chunk.
+
+    This is the fallback used when python-libusb1 is not available.
+    PyUSB converts anything that is not an ``array('B')`` element by
+    element, so each chunk is copied into a fresh array with a single
+    ``frombytes`` call and handed over as is.  Status messages are read
+    by a :class:`StatusPoller` thread, printed between chunks and
+    appended to ``status_buffer``.  Returns the number of bytes sent.
+    """
+    bytes_sent = 0
+    total_len = len(payload)
+    poller = StatusPoller(in_ep, max_pkt)
+    poller.start()
+    try:
+        while bytes_sent < total_len:
+            chunk = array.array("B")
+            chunk.frombytes(payload[bytes_sent : bytes_sent + chunk_size])
+            bytes_sent += out_ep.write(chunk, timeout)
+            # Print intermediate status messages, if any
+            poller.drain(status_buffer)
+    finally:
+        poller.stop()
+    poller.drain(status_buffer)
+    return bytes_sent
+
+def send_payload_async(
+    context: "usb1.USBContext",
+    handle: "usb1.USBDeviceHandle",
+    payload: memoryview,
+    out_ep_addr: int,
+    in_ep_addr: int,
+    max_pkt: int,
+    status_buffer: bytearray,
+    chunk_size: int,
+    timeout: int,
+    queue_depth: int = 4,
+) -> int:
+    """Send ``payload`` through a queue of asynchronous python-libusb1 transfers.
+
+    Up to ``queue_depth`` bulk OUT transfers are kept submitted at once.
+    Each completion callback re-arms its transfer with the next chunk, so
+    the host controller always has work queued instead of waiting for a
+    Python round trip per chunk.  Transfers on one endpoint complete in
+    submission order, so the device still sees a contiguous stream.
+
+    One bulk IN transfer stays submitted alongside them and re-arms
+    itself the same way, so status messages are printed and appended to
+    ``status_buffer`` as they arrive without the OUT queue ever waiting
+    on a read.  Returns the number of bytes sent.
+    """
+    total_len = len(payload)
+    state = {"offset": 0, "sent": 0, "pending": 0, "error": None}
+
+    def submit_next(transfer: "usb1.USBTransfer") -> None:
+        offset = state["offset"]
+        if state["error"] is not None or offset >= total_len:
+            return
+        chunk = payload[offset : offset + chunk_size]
+        transfer.setBulk(out_ep_addr, chunk, callback=on_done, timeout=timeout)
+        transfer.submit()
+        state["offset"] = offset + len(chunk)
+        state["pending"] += 1
+
+    def on_done(transfer: "usb1.USBTransfer") -> None:
+        state["pending"] -= 1
+        if transfer.getStatus() != usb1.TRANSFER_COMPLETED:
+            state["error"] = f"libusb transfer status {transfer.getStatus()}"
+            return
+        actual = transfer.getActualLength()
+        state["sent"] += actual
+        if actual != len(transfer.getBuffer()):
+            state["error"] = (
+                f"short write of {actual} of {len(transfer.getBuffer())} bytes"
+            )
+            return
+        try:
+            submit_next(transfer)
+        except usb1.USBError as exc:
+            # The ctypes callback would swallow this, so record it instead.
+            state["error"] = f"resubmit failed: {exc}"
+
+    def on_status(transfer: "usb1.USBTransfer") -> None:
+        # A cancelled read may still carry a partial message.
+        status = memoryview(transfer.getBuffer())[: transfer.getActualLength()]
+        if status:
+            status_buffer.extend(status)
+            print(f"{decode_status(status)}")
+        if state["pending"] and transfer.getStatus() == usb1.TRANSFER_COMPLETED:
+            transfer.submit()
+
+    status_transfer = handle.getTransfer()
+    status_transfer.setBulk(in_ep_addr, max_pkt, callback=on_status)
+    status_transfer.submit()
+    transfers = [handle.getTransfer() for _ in range(queue_depth)]
+    for transfer in transfers:
+        submit_next(transfer)
+    while state["pending"]:
+        context.handleEvents()
+    if status_transfer.isSubmitted():
+        try:
+            status_transfer.cancel()
+        except usb1.USBErrorNotFound:
+            # Completed just now; its callback runs on the next event.
+            pass
+        while status_transfer.isSubmitted():
+            context.handleEvents()
+    for transfer in transfers + [status_transfer]:
+        transfer.close()
+
+    if state["error"] is not None:
+        raise usb.core.USBError(
+            f"Bulk OUT transfer failed ({state['error']})"
+        )
+    return state["sent"]
 
 def upload_file(
     dev: usb.core.Device,
     filename: str,
     out_ep: usb.core.Endpoint,
     in_ep: usb.core.Endpoint,
-    chunk_size: int = 4096,
+    chunk_size: int = 65536,
     timeout: int = 10000,
     wait_after_header: float = 0.0,
+    interface_index: int = 0,
 ) -> None:
     """Stream the contents of ``filename`` to the Pico via bulk endpoint.
 
-    This sends an 8‑byte header ('FWUP' + little‑endian length), then
-    transmits the file in chunks.  After each write, it attempts to read
-    and print a status string from the device.  At the end of the
+    This sends a 12‑byte header ('FWUC' + little‑endian length and
+    CRC‑32), then transmits the file in chunks, printing any status
+    strings the device sends along the way.  The payload goes through
+    :func:`send_payload_async` when python-libusb1 is available and
+    :func:`send_payload_sync` otherwise.  At the end of the
     transfer, it waits for a final status message (typically "OK") to
     confirm that the firmware finished writing the flash.
+    ``interface_index`` is the interface the endpoints belong to (see
+    :func:`get_endpoints`); python-libusb1 claims it for the payload.
     """
 
-    status = ""
-    status_buffer = ""
-    # Read file into memory.  For very large images, you may prefer
-    # streaming from disk, but reading all data simplifies the logic.
-    with open(filename, "rb") as f:
-        data = f.read()
-    total_len = len(data)
-
-    print(f"Uploading {filename} ({total_len} bytes)")
-
-    # Construct and send header: magic + length
-    header = b"FWUP" + struct.pack("<I", total_len)
-    print("→ Sending header…", end=" ")
-    out_ep.write(header, timeout)
-    print("done")
-
-    # If the device performs a lengthy erase of its flash after
-    # receiving the header, the host must wait before sending the
-    # payload.  Use the ``wait_after_header`` parameter to add a
-    # configurable delay here.  Without this pause, large uploads may
-    # cause the host to time out because the device is not ready to
-    # accept data while erasing.
-    if wait_after_header > 0:
-        print(f"→ Waiting {wait_after_header:.1f}s for device to prepare…")
-        time.sleep(wait_after_header)
-
-    # once waiting for the erase works we can refactor this to use the wait_for_status function
-    print('-------------------------- Checking for HEADER_OK -------------------------- ')
-
-
-    target_string = f"HEADER_OK {total_len}"
-    
-    while target_string not in status_buffer:
-        status = read_status(in_ep, timeout)
-        if status:
-            status_buffer += status
-            continue
+    with contextlib.ExitStack() as stack:
+        handle = None
+        if usb1 is not None:
+            # Open the python-libusb1 handle up front so the file can be
+            # read straight into DMA-capable memory.  It only claims the
+            # interface once the payload phase starts.
+            context = stack.enter_context(usb1.USBContext())
+            try:
+                handle = open_libusb1_handle(context, dev)
+            except (usb1.USBError, ValueError) as exc:
+                print(f"→ python-libusb1 could not open the device ({exc}); using PyUSB writes")
+            else:
+                stack.callback(handle.close)
+
+        status_buffer = bytearray()
+        # Looked up once; every status read below needs it.
+        max_pkt = in_ep.wMaxPacketSize
+        # Map the file (or read it into DMA memory) rather than copying
+        # it into a bytes object; see load_payload().
+        data, release_data = load_payload(filename, handle)
+        stack.callback(release_data)
+        # Say which buffer was used: the dev-mem path depends on
+        # python-libusb1 internals and falls back quietly otherwise.
+        if isinstance(data, ctypes.Array):
+            buffer_kind = "libusb dev-mem buffer"
+        elif isinstance(data, mmap.mmap):
+            buffer_kind = "memory-mapped file"
         else:
-            sleep(0.1)
-    target_slice_start, target_slice_end = end_index(status_buffer, target_string)
-    status_buffer = status_buffer[target_slice_end:]
-    print(f"SB:{status_buffer}\n")
-
-    print('-------------------------- HEADER_OK → ERASE_START -------------------------- ')
-
-    # Read any immediate status (e.g. device acknowledging erase)
-    print("→ Reading status…", end=" ")
-
-    wait_for_status(status_buffer, "ERASE_START", in_ep, timeout)
-    print("Erase Started...")
-    wait_for_status(status_buffer, "ERASE_DONE", in_ep, timeout)
-    print("Erase Done...")
-
+            buffer_kind = "bytes"
+        # One view over the whole image; slicing it never copies.
+        payload = memoryview(data)
+        stack.callback(payload.release)
+        total_len = len(payload)
+        if not total_len:
+            # The firmware treats a zero length as "no upload" and never
+            # answers with a CRC verdict, so don't start one.
+            raise ValueError(f"{filename} is empty; nothing to upload")
+
+        # zlib.crc32 is the same CRC‑32 the firmware computes when it
+        # reads the flash back.
+        crc = zlib.crc32(payload)
+
+        print(
+            f"Uploading {filename} ({total_len} bytes, CRC-32 0x{crc:08x}, "
+            f"{buffer_kind})"
+        )
 
+        # Construct and send header: magic + length + CRC
+        header = FWUP_HEADER.pack(FWUP_MAGIC, total_len, crc)
+        print("→ Sending header…", end=" ")
+        out_ep.write(header, timeout)
+        print("done")
 
-    # Send data in chunks
-    bytes_sent = 0
-    # Simple progress indicator without external dependencies
-    last_percent = -1
-    while bytes_sent < total_len:
-        chunk = data[bytes_sent : bytes_sent + chunk_size]
-        bytes_sent += out_ep.write(chunk, timeout)
-        # Progress output
-        # percent = int(bytes_sent * 100 / total_len)
-        # if percent != last_percent:
-        #     sys.stdout.write(f"\r→ Progress: {percent}%")
-        #     sys.stdout.flush()
-        #     last_percent = percent
-        # Read intermediate status messages, if any
-        try:
-            status = read_status(in_ep, 5, suppress_exceptions=True)
-        except usb.core.USBError as e:
-            pass
-        if status:
-            print(f"{status}") # Called 3 times
-
-    print("")
-
-    # Wait for final status
-    print("→ Waiting for completion acknowledgement…", end=" ")
-    done_msg = None
-    # Loop until we read a message or a timeout occurs
-    start_time = time.monotonic()
-    while True:
-        done_msg = read_status(in_ep, timeout, suppress_exceptions=True)
-        if done_msg:
-            break
-        if time.monotonic() - start_time > (timeout / 1000.0):
-            # If the device does not respond in time, give up
-            break
-    if done_msg:
+        # If the device performs a lengthy erase of its flash after
+        # receiving the header, the host must wait before sending the
+        # payload.  Use the ``wait_after_header`` parameter to add a
+        # configurable delay here.  Without this pause, large uploads may
+        # cause the host to time out because the device is not ready to
+        # accept data while erasing.
+        if wait_after_header > 0:
+            print(f"→ Waiting {wait_after_header:.1f}s for device to prepare…")
+            time.sleep(wait_after_header)
+
+        status_buffer = wait_for_status(status_buffer, f"HEADER_OK {total_len}", in_ep, timeout, max_pkt=max_pkt)
+
+        # Read any immediate status (e.g. device acknowledging erase)
+        print("→ Reading status…", end=" ")
+
+        status_buffer = wait_for_status(status_buffer, "ERASE_START", in_ep, timeout, max_pkt=max_pkt)
+        print("Erase Started...")
+        # Erase time grows with the image size, so there is no fixed
+        # upper bound on how long ERASE_DONE can take.
+        status_buffer = wait_for_status(status_buffer, "ERASE_DONE", in_ep, None, max_pkt=max_pkt)
+        print("Erase Done...")
+
+
+
+        # Send data in chunks
+        claimed = None
+        if handle is not None:
+            # Hand the interface over from PyUSB to python-libusb1 for the
+            # payload.  PyUSB claims it again on the next status read, which
+            # also covers falling back to it here.
+            usb.util.dispose_resources(dev)
+            try:
+                claimed = handle.claimInterface(interface_index)
+            except usb1.USBError as exc:
+                print(f"→ python-libusb1 could not claim interface {interface_index} ({exc}); using PyUSB writes")
+        if claimed is None:
+            bytes_sent = send_payload_sync(
+                payload, out_ep, in_ep, max_pkt, status_buffer, chunk_size, timeout
+            )
+        else:
+            with claimed:
+                bytes_sent = send_payload_async(
+                    context,
+                    handle,
+                    payload,
+                    out_ep.bEndpointAddress,
+                    in_ep.bEndpointAddress,
+                    max_pkt,
+                    status_buffer,
+                    chunk_size,
+                    timeout,
+                )
+        if bytes_sent != total_len:
+            raise usb.core.USBError(
+                f"Only {bytes_sent} of {total_len} payload bytes were sent"
+            )
+
+        print("")
+
+        # Wait for final status.  After programming, the device reads the
+        # flash back and checks it against the CRC from the header before
+        # answering CRC_OK or CRC_FAIL (followed by OK).  The status poller
+        # may already have picked the answer up.
+        print("→ Waiting for completion acknowledgement…", end=" ")
+        verdicts = (b"CRC_OK", b"CRC_FAIL")
+        keep = max(map(len, verdicts)) + max_pkt
+        # The read-back takes longer the larger the image, so, as for
+        # ERASE_DONE, there is no fixed upper bound on the wait.
+        while True:
+            verdict = next((v for v in verdicts if v in status_buffer), None)
+            if verdict is not None:
+                break
+            del status_buffer[:-keep]
+            status = read_status(in_ep, timeout, max_pkt=max_pkt)
+            if status:
+                status_buffer += status
         print("done")
-        print(f"Device: {done_msg}")
-    else:
-        print("no acknowledgement received (timeout)")
+        print(f"Device: {decode_status(verdict)}")
+        if verdict == b"CRC_FAIL":
+            raise ValueError(
+                f"Device reported a CRC mismatch after writing {filename}"
+            )
 
 
 def main(argv: Optional[list[str]] = None) -> int:
@@ -301,8 +705,12 @@ def main(argv: Optional[list[str]] = None) -> int:
     parser.add_argument(
         "--chunk-size",
         type=int,
-        default=4096,
-        help="Number of bytes to send per USB packet (default: 4096)",
+        default=65536,
+        help=(
+            "Number of bytes to send per bulk transfer (default: 65536).  "
+            "The host controller splits each transfer into packets, so large "
+            "values mainly cut per-call overhead"
+        ),
     )
     parser.add_argument(
         "--timeout",
@@ -335,8 +743,9 @@ def main(argv: Optional[list[str]] = None) -> int:
 
     # Get endpoints from interface 0.  You can adjust if your descriptor
     # changes.
+    interface_index = 0
     try:
-        out_ep, in_ep = get_endpoints(dev, 0, args.out_ep, args.in_ep)
+        out_ep, in_ep = get_endpoints(dev, interface_index, args.out_ep, args.in_ep)
     except ValueError as e:
         sys.stderr.write(str(e) + "\n")
         return 1
@@ -350,8 +759,12 @@ def main(argv: Optional[list[str]] = None) -> int:
             chunk_size=args.chunk_size,
             timeout=args.timeout,
             wait_after_header=args.wait_after_header,
+            interface_index=interface_index,
         )
-    except usb.core.USBError as e:
+    except ValueError as e:
+        sys.stderr.write(str(e) + "\n")
+        return 1
+    except USB_ERRORS as e:
         sys.stderr.write(f"---------------USB error: {e}-----------------------\n")
         raise e
         return 1
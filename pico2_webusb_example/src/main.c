@@ -4,11 +4,16 @@
 // Firmware for the Raspberry Pi Pico 2 (RP2350) exposing a TinyUSB
 // vendor bulk interface.  Incoming data is written directly to an
 // attached SPI flash chip.  The protocol is intentionally simple:
-// the host first sends an 8‑byte header consisting of the four
-// characters 'F','W','U','P' followed by a little‑endian 32‑bit
-// total byte count.  The device erases the flash region starting at
-// address 0 that spans the incoming payload and then programs data
-// pages as chunks arrive over the USB bulk endpoint.
+// the host first sends a 12‑byte header consisting of the four
+// characters 'F','W','U','C' followed by a little‑endian 32‑bit
+// total byte count and a little‑endian CRC‑32 of the payload.  The
+// device erases the flash region starting at address 0 that spans
+// the incoming payload and then programs data pages as chunks arrive
+// over the USB bulk endpoint.  Once everything is written it reads the
+// region back, checks it against the CRC and reports CRC_OK or
+// CRC_FAIL, so the host does not need a separate verify pass.  The
+// magic was 'F','W','U','P' for the older 8‑byte header without a
+// CRC; such headers are rejected rather than misparsed.
 
 #include <string.h>
 #include <stdio.h>
@@ -34,6 +39,7 @@
 #define CMD_WREN              0x06
 #define CMD_RDSR              0x05
 #define CMD_PP                0x02
+#define CMD_READ              0x03
 #define CMD_SECTOR_ERASE_4K   0x20
 #define CMD_RDID              0x9F
 
@@ -42,14 +48,20 @@
 #define SECTOR_SIZE           4096
 
 // Protocol header constants.  The host sends these four ASCII
-// characters followed by a 32‑bit little‑endian total size.
-static const uint8_t PROTO_MAGIC[4] = {'F','W','U','P'};
+// characters followed by a 32‑bit little‑endian total size and a
+// 32‑bit little‑endian CRC‑32 of the payload.  The magic differs from
+// the older CRC‑less 'FWUP' header so that a host and firmware that
+// disagree on the layout reject each other instead of flashing an
+// image shifted by four bytes.
+static const uint8_t PROTO_MAGIC[4] = {'F','W','U','C'};
+#define PROTO_HEADER_SIZE     12
 
 
 
 // #^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 // Global state for the current upload session
 static uint32_t expected_total = 0;
+static uint32_t expected_crc   = 0;
 static uint32_t received_total = 0;
 static uint32_t write_addr      = 0;
 static bool header_received     = false;
@@ -115,6 +127,18 @@ static void flash_read_jedec(uint8_t id[3]) {
   cs_high();
 }
 
+// Read `len` bytes starting at `addr` with the plain READ command.
+static void flash_read(uint32_t addr, uint8_t *data, uint32_t len) {
+  uint8_t cmd[4] = { CMD_READ,
+                     (uint8_t)(addr >> 16),
+                     (uint8_t)(addr >> 8),
+                     (uint8_t)(addr) };
+  cs_low();
+  spi_write_blocking(FLASH_SPI, cmd, sizeof(cmd));
+  spi_read_blocking(FLASH_SPI, 0xFF, data, len);
+  cs_high();
+}
+
 // Erase a 4‑KiB sector at the given address.  Assumes address is
 // sector‑aligned.  If your device requires larger erase units,
 // update CMD_SECTOR_ERASE_4K accordingly.
@@ -171,6 +195,44 @@ static void erase_range_4k_aligned(uint32_t start, uint32_t size) {
 }
 
 
+// CRC‑32 (IEEE 802.3, reflected), the same checksum as Python's
+// zlib.crc32.  The table is filled once at start‑up.
+static uint32_t crc32_table[256];
+
+static void crc32_init(void) {
+  for (uint32_t i = 0; i < 256; i++) {
+    uint32_t c = i;
+    for (int k = 0; k < 8; k++) {
+      c = (c & 1) ? (0xEDB88320u ^ (c >> 1)) : (c >> 1);
+    }
+    crc32_table[i] = c;
+  }
+}
+
+static uint32_t crc32_update(uint32_t crc, const uint8_t *buf, uint32_t len) {
+  crc = ~crc;
+  while (len--) {
+    crc = crc32_table[(crc ^ *buf++) & 0xFF] ^ (crc >> 8);
+  }
+  return ~crc;
+}
+
+// Read back `size` bytes of flash from `start` and return their CRC‑32
+static uint32_t flash_crc32(uint32_t start, uint32_t size) {
+  uint8_t buf[PAGE_SIZE];
+  uint32_t crc = 0;
+  for (uint32_t off = 0; off < size; off += sizeof buf) {
+    uint32_t n = size - off;
+    if (n > sizeof buf) n = sizeof buf;
+    flash_read(start + off, buf, n);
+    crc = crc32_update(crc, buf, n);
+    if ((off & (SECTOR_SIZE - 1)) == 0) {
+      tud_task(); /* keep USB stack alive */
+    }
+  }
+  return crc;
+}
+
 // Program a sequence of bytes, taking care not to cross page
 // boundaries.  write_addr is updated globally.
 static void program_stream(const uint8_t *buf, uint32_t len) {
@@ -188,6 +250,7 @@ static void program_stream(const uint8_t *buf, uint32_t len) {
 // Reset the current upload session
 static void reset_session(void) {
   expected_total = 0;
+  expected_crc = 0;
   received_total = 0;
   write_addr = 0;
   header_received = false;
@@ -206,9 +269,11 @@ static void handle_vendor_out(void) {
     uint32_t n = tud_vendor_read(tmp, sizeof tmp);
     if (!header_received) {
       /* parse header */
-      if (n < 8 || memcmp(tmp, PROTO_MAGIC, 4)) { reset_session(); return; }
+      if (n < PROTO_HEADER_SIZE || memcmp(tmp, PROTO_MAGIC, 4)) { reset_session(); return; }
       expected_total = (uint32_t)tmp[4] | ((uint32_t)tmp[5] << 8) |
                        ((uint32_t)tmp[6] << 16) | ((uint32_t)tmp[7] << 24);
+      expected_crc   = (uint32_t)tmp[8] | ((uint32_t)tmp[9] << 8) |
+                       ((uint32_t)tmp[10] << 16) | ((uint32_t)tmp[11] << 24);
       /* announce header and erase */
       {
         char msg[40];
@@ -220,9 +285,9 @@ static void handle_vendor_out(void) {
       STATUS_MSG("ERASE_DONE");
       header_received = true;
       /* handle any payload in this first packet */
-      uint32_t remain = n - 8;
+      uint32_t remain = n - PROTO_HEADER_SIZE;
       if (remain) {
-        program_stream(tmp + 8, remain);
+        program_stream(tmp + PROTO_HEADER_SIZE, remain);
         received_total += remain;
         uint8_t pct = (uint8_t)((received_total * 100U) / expected_total);
         if (pct > last_percent_sent) {
@@ -243,8 +308,9 @@ static void handle_vendor_out(void) {
         last_percent_sent = pct;
       }
     }
-    /* final OK and reset */
+    /* verify what was written, then final OK and reset */
     if (expected_total && received_total >= expected_total) {
+      STATUS_MSG(flash_crc32(0, expected_total) == expected_crc ? "CRC_OK" : "CRC_FAIL");
       STATUS_MSG("OK");
       reset_session();
     }
@@ -255,6 +321,7 @@ int main(void) {
   // Initialise standard I/O (for optional debug) and the SPI flash
   stdio_init_all();
   flash_spi_init();
+  crc32_init();
   printf("main() start\n");
 
   // Read the JEDEC ID for informational purposes.  If you have a